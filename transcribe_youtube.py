@@ -1,16 +1,35 @@
 #!/usr/bin/env python3
 import re
 import os
+import ast
+import operator
 import csv
+import json
+import socket
+import sqlite3
+import threading
+import uuid
+import multiprocessing
+from urllib.parse import urlsplit, urlunsplit
+import random
+import shlex
+import shutil
+import subprocess
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
 import time
 from pathlib import Path
 
 import click
+import numpy as np
 import pandas as pd
 from tqdm import tqdm
-from youtube_transcript_api import YouTubeTranscriptApi
+from youtube_transcript_api import YouTubeTranscriptApi, RequestBlocked, YouTubeRequestFailed
+from youtube_transcript_api.proxies import GenericProxyConfig
+from requests.exceptions import ConnectionError as RequestsConnectionError, HTTPError, ProxyError
 from googleapiclient.discovery import build
 from dotenv import load_dotenv
 
@@ -21,6 +40,15 @@ load_dotenv()
 _current_api_key_index = 0
 _api_keys = []
 
+# Global egress pool for transcript fetches (None = direct connection only)
+_egress_pool = None
+
+# Global settings for the local ASR fallback (None = disabled)
+_asr_settings = None
+_asr_executor = None
+_asr_executor_lock = threading.Lock()
+_asr_model = None  # ASRワーカープロセス内で読み込まれるモデル
+
 
 def parse_duration(duration: str) -> int:
     """ISO 8601 duration (PT1H2M3S) を秒数に変換"""
@@ -150,6 +178,7 @@ def create_output_directory(base_dir: str, channel_name: str) -> Path:
     
     # サブディレクトリを作成
     (output_path / "transcripts").mkdir(exist_ok=True)
+    (output_path / "segments").mkdir(exist_ok=True)
     (output_path / "data").mkdir(exist_ok=True)
     
     return output_path
@@ -356,33 +385,759 @@ def get_video_info(video_id: str) -> Dict[str, Any]:
     return {}
 
 
-def fetch_transcript(video_id: str) -> str:
-    api = YouTubeTranscriptApi()
+class EgressBlockedError(RuntimeError):
+    """IPブロック・レート制限・プロキシ接続失敗など、接続経路に起因するエラー"""
+
+
+def is_egress_error(error: Exception) -> bool:
+    """エラーが接続経路（IP/プロキシ）に起因するものか判定"""
+    if isinstance(error, (RequestBlocked, ProxyError, RequestsConnectionError)):
+        return True
+    if isinstance(error, YouTubeRequestFailed):
+        # 元の HTTPError のステータスコードで判定（メッセージには動画URLが含まれるため文字列では判定しない）
+        http_error = error.__context__
+        if isinstance(http_error, HTTPError) and http_error.response is not None:
+            return http_error.response.status_code == 429
+        return error.reason.startswith('429 ')
+    return False
+
+
+def redact_proxy_url(url: str) -> str:
+    """表示用にプロキシURLから認証情報（user:pass@）を取り除く"""
+    parts = urlsplit(url)
+    host = parts.netloc.rpartition('@')[2]
+    return urlunsplit(parts._replace(netloc=host))
+
+
+class EgressEndpoint:
+    """文字起こし取得に使うプロキシ（またはダイレクト接続）1つ分の状態と統計"""
+    
+    def __init__(self, url: Optional[str], max_concurrency: int, window: int = 20):
+        self.url = url  # None はダイレクト接続
+        self.name = redact_proxy_url(url) if url else 'direct'
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.recent = deque(maxlen=window)  # 直近の成否（True/False）
+        self.requests = 0
+        self.successes = 0
+        self.blocks = 0
+        self.consecutive_blocks = 0
+        self.cooldown_until = 0.0
+        self._local = threading.local()  # スレッドごとにHTTPセッションを分ける
+    
+    def success_rate(self) -> float:
+        """直近の成功率（試行が少ない場合に極端な値にならないよう平滑化）"""
+        return (sum(self.recent) + 1) / (len(self.recent) + 2)
+    
+    def state(self, now: float) -> str:
+        """サーキットブレーカーの状態: closed / open（クールダウン中）/ half-open（試験的に1本だけ許可）"""
+        if now < self.cooldown_until:
+            return 'open'
+        if self.consecutive_blocks > 0:
+            return 'half-open'
+        return 'closed'
+    
+    def is_available(self, now: float) -> bool:
+        state = self.state(now)
+        if state == 'open':
+            return False
+        if state == 'half-open':
+            return self.in_flight == 0
+        return self.in_flight < self.max_concurrency
+    
+    def get_api(self) -> YouTubeTranscriptApi:
+        api = getattr(self._local, 'api', None)
+        if api is None:
+            if self.url:
+                proxy_config = GenericProxyConfig(http_url=self.url, https_url=self.url)
+                api = YouTubeTranscriptApi(proxy_config=proxy_config)
+            else:
+                api = YouTubeTranscriptApi()
+            self._local.api = api
+        return api
+
+
+class EgressPool:
+    """ヘルスチェック付きのプロキシプール
+    
+    エンドポイントごとに同時実行数を制限し、ブロックされたエンドポイントは
+    指数的に伸びるクールダウンの間リクエストを送らない。健全なエンドポイントの中から
+    直近の成功率に比例した確率で選択する。
+    """
+    
+    def __init__(self, urls: List[Optional[str]], max_concurrency: int = 2, cooldown: float = 60.0,
+                 max_cooldown: float = 900.0, max_wait: float = 300.0):
+        self.endpoints = [EgressEndpoint(url, max_concurrency) for url in urls]
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.max_wait = max_wait
+        self._cond = threading.Condition()
+    
+    def acquire(self, deadline: Optional[float] = None) -> EgressEndpoint:
+        """利用可能なエンドポイントを1つ確保（全て使用中・クールダウン中なら deadline まで待機）"""
+        if deadline is None:
+            deadline = time.time() + self.max_wait
+        with self._cond:
+            while True:
+                now = time.time()
+                candidates = [ep for ep in self.endpoints if ep.is_available(now)]
+                if candidates:
+                    endpoint = random.choices(candidates, weights=[ep.success_rate() for ep in candidates])[0]
+                    endpoint.in_flight += 1
+                    endpoint.requests += 1
+                    return endpoint
+                if now >= deadline:
+                    raise EgressBlockedError("No healthy egress endpoint available")
+                # 最も早くクールダウンが明けるまで（または解放通知まで）待機
+                wake_at = min([ep.cooldown_until for ep in self.endpoints if ep.cooldown_until > now] + [deadline])
+                self._cond.wait(max(wake_at - now, 0.01))
+    
+    def release(self, endpoint: EgressEndpoint, blocked: bool) -> None:
+        """結果を記録してエンドポイントを解放"""
+        with self._cond:
+            endpoint.in_flight -= 1
+            endpoint.recent.append(not blocked)
+            if blocked:
+                endpoint.blocks += 1
+                endpoint.consecutive_blocks += 1
+                cooldown = min(self.cooldown * 2 ** (endpoint.consecutive_blocks - 1), self.max_cooldown)
+                endpoint.cooldown_until = time.time() + cooldown
+            else:
+                endpoint.successes += 1
+                endpoint.consecutive_blocks = 0
+            self._cond.notify_all()
+    
+    def report(self) -> None:
+        """エンドポイントごとの統計を表示"""
+        now = time.time()
+        click.echo("\n🌐 Egress endpoint stats:")
+        for ep in self.endpoints:
+            rate = (ep.successes / ep.requests * 100) if ep.requests > 0 else 0
+            click.echo(
+                f"  {ep.name}: requests={ep.requests} ok={ep.successes} blocked={ep.blocks} "
+                f"success={rate:.1f}% state={ep.state(now)}"
+            )
+
+
+def load_proxy_urls() -> List[Optional[str]]:
+    """環境変数 TRANSCRIPT_PROXIES（カンマ区切り）からプロキシURLを読み込む"""
+    value = os.getenv('TRANSCRIPT_PROXIES', '')
+    return [url.strip() for url in value.split(',') if url.strip()]
+
+
+def configure_egress_pool(proxies: tuple = (), max_concurrency: int = 2) -> None:
+    """文字起こし取得用のプロキシプールを設定（指定がなければ環境変数を使用）
+    
+    "direct" を指定するとプロキシを経由しない接続もプールに含める。
+    """
+    global _egress_pool
+    urls = list(proxies) or load_proxy_urls()
+    if not urls:
+        _egress_pool = None
+        return
+    _egress_pool = EgressPool([None if url == 'direct' else url for url in urls], max_concurrency)
+    click.echo(f"Loaded {len(urls)} egress endpoint(s)")
+
+
+def transcript_concurrency() -> int:
+    """同時に処理する動画数（プロキシプールがあれば各エンドポイントの上限の合計）"""
+    if _egress_pool is None:
+        return 1
+    return sum(ep.max_concurrency for ep in _egress_pool.endpoints)
+
+
+def report_egress_stats() -> None:
+    """プロキシプールが設定されていれば統計を表示"""
+    if _egress_pool is not None:
+        _egress_pool.report()
+
+
+def get_videos_info(video_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """複数動画の詳細情報を50件ずつまとめて取得（動画ID → 動画情報）"""
+    infos: Dict[str, Dict[str, Any]] = {}
+    max_retries = len(load_api_keys())
+    
+    for i in range(0, len(video_ids), 50):
+        batch = video_ids[i:i + 50]
+        for attempt in range(max_retries):
+            try:
+                youtube = get_youtube_service()
+                
+                video_response = youtube.videos().list(
+                    part='snippet,statistics,contentDetails,liveStreamingDetails',
+                    id=','.join(batch),
+                    maxResults=50
+                ).execute()
+                
+                for item in video_response['items']:
+                    infos[item['id']] = item
+                break
+                
+            except Exception as e:
+                if handle_api_error(e, "video info batch fetch"):
+                    continue  # 次のAPIキーでリトライ
+                else:
+                    break
+        else:
+            click.echo("All API keys exhausted for video info batch fetch", err=True)
+        
+        # API制限を考慮して少し待機
+        time.sleep(0.1)
+    
+    return infos
+
+
+FILTER_FIELDS = {
+    'duration': "動画時間（秒）",
+    'views': "視聴回数",
+    'likes': "高評価数",
+    'comments': "コメント数",
+    'engagement': "視聴エンゲージメント率（%）",
+    'like_rate': "視聴高評価率（%）",
+    'comment_rate': "視聴コメント率（%）",
+    'spread': "拡散率（%）",
+    'age_days': "投稿からの経過日数",
+    'live': "ライブ配信（配信中・予定・アーカイブ）かどうか。プレミア公開はAPI上区別できないため含まれる",
+    'short': "--short-max-seconds（デフォルト180秒）以下の動画かどうか",
+    'title': "動画タイトル",
+}
+
+_FILTER_COMPARE_OPS = {
+    ast.Eq: operator.eq, ast.NotEq: operator.ne,
+    ast.Lt: operator.lt, ast.LtE: operator.le,
+    ast.Gt: operator.gt, ast.GtE: operator.ge,
+    ast.In: lambda a, b: a in b, ast.NotIn: lambda a, b: a not in b,
+}
+
+_FILTER_BIN_OPS = {
+    ast.Add: operator.add, ast.Sub: operator.sub,
+    ast.Mult: operator.mul, ast.Div: operator.truediv,
+}
+
+
+def compile_filter_expression(expression: str) -> ast.Expression:
+    """フィルタ式（例: duration>=120 and views>=10000 and not live）を構文解析・検証"""
+    try:
+        tree = ast.parse(expression, mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"Invalid filter expression: {e.msg}")
+    
+    allowed = (ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub,
+               ast.Compare, ast.BinOp, ast.Name, ast.Load, ast.Constant,
+               *_FILTER_COMPARE_OPS, *_FILTER_BIN_OPS)
+    for node in ast.walk(tree):
+        if not isinstance(node, allowed):
+            raise ValueError(f"Unsupported syntax in filter expression: {type(node).__name__}")
+        if isinstance(node, ast.Name) and node.id not in FILTER_FIELDS:
+            raise ValueError(f"Unknown filter field: {node.id} (available: {', '.join(FILTER_FIELDS)})")
+    return tree
+
+
+def evaluate_filter(node: ast.AST, fields: Dict[str, Any]) -> Any:
+    """検証済みのフィルタ式を動画メタデータに対して評価"""
+    if isinstance(node, ast.Expression):
+        return evaluate_filter(node.body, fields)
+    if isinstance(node, ast.BoolOp):
+        values = (evaluate_filter(v, fields) for v in node.values)
+        return all(values) if isinstance(node.op, ast.And) else any(values)
+    if isinstance(node, ast.UnaryOp):
+        value = evaluate_filter(node.operand, fields)
+        return not value if isinstance(node.op, ast.Not) else -value
+    if isinstance(node, ast.Compare):
+        left = evaluate_filter(node.left, fields)
+        for op, comparator in zip(node.ops, node.comparators):
+            right = evaluate_filter(comparator, fields)
+            if not _FILTER_COMPARE_OPS[type(op)](left, right):
+                return False
+            left = right
+        return True
+    if isinstance(node, ast.BinOp):
+        return _FILTER_BIN_OPS[type(node.op)](evaluate_filter(node.left, fields), evaluate_filter(node.right, fields))
+    if isinstance(node, ast.Name):
+        return fields[node.id]
+    return node.value  # ast.Constant
+
+
+def validate_filter_option(ctx, param, value: Optional[str]) -> Optional[str]:
+    """--filter オプションの値を処理開始前に検証"""
+    if value is not None:
+        try:
+            compile_filter_expression(value)
+        except ValueError as e:
+            raise click.BadParameter(str(e))
+    return value
+
+
+def video_filter_fields(video_info: Dict[str, Any], subscriber_count: int,
+                        short_max_seconds: int = 180) -> Dict[str, Any]:
+    """動画情報からフィルタ・並び替えに使う値を作成"""
+    snippet = video_info.get('snippet', {})
+    statistics = video_info.get('statistics', {})
+    duration = parse_duration(video_info.get('contentDetails', {}).get('duration', 'PT0S'))
+    metrics = calculate_engagement_metrics(statistics, subscriber_count)
+    
+    published_at = snippet.get('publishedAt', '')
+    age_days = 0
+    if published_at:
+        published = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
+        age_days = (datetime.now(published.tzinfo) - published).days
+    
+    return {
+        'duration': duration,
+        'views': int(statistics.get('viewCount', 0)),
+        'likes': int(statistics.get('likeCount', 0)),
+        'comments': int(statistics.get('commentCount', 0)),
+        'engagement': metrics['engagement_rate'],
+        'like_rate': metrics['like_rate'],
+        'comment_rate': metrics['comment_rate'],
+        'spread': metrics['spread_rate'],
+        'age_days': age_days,
+        # 配信予定のまま実施されなかった枠は除き、実際に開始された配信のみを対象とする。
+        # プレミア公開も liveStreamingDetails を持ち、Data API では通常の配信と区別できない
+        'live': (snippet.get('liveBroadcastContent', 'none') != 'none'
+                 or 'actualStartTime' in video_info.get('liveStreamingDetails', {})),
+        'short': 0 < duration <= short_max_seconds,
+        'title': snippet.get('title', ''),
+    }
+
+
+ORDER_BY_FIELDS = ['views', 'likes', 'comments', 'engagement', 'duration']
+
+
+def select_videos(video_ids: List[str], subscriber_count: int, filter_expression: Optional[str] = None,
+                  order_by: Optional[str] = None, top: Optional[int] = None,
+                  short_max_seconds: int = 180) -> tuple[List[str], Dict[str, Dict[str, Any]]]:
+    """メタデータを一括取得し、文字起こし前にフィルタ・並び替え・上位N件の選択を行う"""
+    click.echo("🔎 Fetching video metadata...")
+    infos = get_videos_info(video_ids)
+    
+    selected = []
+    fields_by_id = {}
+    tree = compile_filter_expression(filter_expression) if filter_expression else None
+    evaluation_errors = 0
+    for video_id in video_ids:
+        info = infos.get(video_id)
+        if not info or 'snippet' not in info:
+            # 情報が取得できなかった動画は後段で個別に再取得する
+            if tree is None and order_by is None:
+                selected.append(video_id)
+            continue
+        fields = video_filter_fields(info, subscriber_count, short_max_seconds)
+        if tree is not None:
+            # ゼロ除算や型の不一致で評価できない動画は条件に合わないものとして扱う
+            try:
+                matched = evaluate_filter(tree, fields)
+            except (ArithmeticError, TypeError) as e:
+                if evaluation_errors == 0:
+                    click.echo(f"⚠️  Filter could not be evaluated for {video_id}: {e} (treated as no match)", err=True)
+                evaluation_errors += 1
+                continue
+            if not matched:
+                continue
+        fields_by_id[video_id] = fields
+        selected.append(video_id)
+    
+    if evaluation_errors > 1:
+        click.echo(f"⚠️  Filter could not be evaluated for {evaluation_errors} videos in total", err=True)
+    if filter_expression:
+        click.echo(f"🧹 Filter '{filter_expression}': {len(selected)}/{len(video_ids)} videos matched")
+    
+    if order_by:
+        selected.sort(key=lambda video_id: fields_by_id[video_id][order_by], reverse=True)
+    if top is not None:
+        selected = selected[:top]
+        click.echo(f"🏆 Selected top {len(selected)} videos" + (f" by {order_by}" if order_by else ""))
+    
+    return selected, infos
+
+
+def snippets_to_segments(chunks) -> List[Dict[str, Any]]:
+    """字幕スニペットをタイムスタンプ付きセグメント（text/start/duration）に変換"""
+    return [{'text': c.text, 'start': float(c.start), 'duration': float(c.duration)} for c in chunks]
+
+
+def _fetch_transcript_via(api: YouTubeTranscriptApi, video_id: str) -> List[Dict[str, Any]]:
     preferred_languages = ["ja", "ja-JP", "en", "en-US"]
     last_error: Optional[Exception] = None
     for lang in preferred_languages:
         try:
             chunks = api.fetch(video_id, languages=[lang])
-            return " ".join([c.text for c in chunks])
+            return snippets_to_segments(chunks)
         except Exception as e:  # noqa: BLE001
+            if is_egress_error(e):
+                raise EgressBlockedError(f"Blocked while fetching transcript: {e}")
             last_error = e
             continue
     try:
         chunks = api.fetch(video_id)
-        return " ".join([c.text for c in chunks])
+        return snippets_to_segments(chunks)
     except Exception as e:  # noqa: BLE001
+        if is_egress_error(e):
+            raise EgressBlockedError(f"Blocked while fetching transcript: {e}")
         raise RuntimeError(f"Could not fetch transcript: {e or last_error}")
 
 
+def fetch_caption_segments(video_id: str) -> List[Dict[str, Any]]:
+    """字幕トラックからタイムスタンプ付きセグメントを取得"""
+    if _egress_pool is None:
+        return _fetch_transcript_via(YouTubeTranscriptApi(), video_id)
+    
+    # ブロックされた場合は、クールダウン明けを待ちつつ max_wait 秒まで健全なエンドポイントでリトライ
+    deadline = time.time() + _egress_pool.max_wait
+    while True:
+        endpoint = _egress_pool.acquire(deadline)
+        blocked = False
+        try:
+            return _fetch_transcript_via(endpoint.get_api(), video_id)
+        except EgressBlockedError as e:
+            blocked = True
+            if time.time() >= deadline:
+                raise EgressBlockedError(f"Could not fetch transcript: egress endpoints kept blocking ({e})")
+        finally:
+            _egress_pool.release(endpoint, blocked)
+
+
+def fetch_transcript_segments(video_id: str) -> List[Dict[str, Any]]:
+    """字幕を取得し、字幕がなければローカルASRにフォールバック（有効な場合）"""
+    try:
+        return fetch_caption_segments(video_id)
+    except EgressBlockedError:
+        raise
+    except RuntimeError as caption_error:
+        if _asr_settings is None:
+            raise
+        click.echo(f"🎙️  No captions for {video_id}; falling back to local ASR")
+        try:
+            return transcribe_video_audio(video_id)
+        except Exception as asr_error:
+            raise RuntimeError(f"{caption_error}; ASR fallback failed: {asr_error}")
+
+
+def fetch_transcript(video_id: str) -> str:
+    return " ".join([seg['text'] for seg in fetch_transcript_segments(video_id)])
+
+
+ASR_SAMPLE_RATE = 16000
+
+
+def configure_asr_fallback(enabled: bool, audio_dir: Optional[str] = None, downloader: Optional[str] = None,
+                           model: str = "small", workers: Optional[int] = None, batch_size: int = 8,
+                           language: Optional[str] = None) -> None:
+    """字幕のない動画向けのローカルASRフォールバックを設定"""
+    global _asr_settings
+    if not enabled:
+        _asr_settings = None
+        return
+    if not audio_dir and not downloader:
+        raise click.ClickException("ASR fallback requires --audio-dir or --audio-downloader")
+    _asr_settings = {
+        'audio_dir': audio_dir,
+        'downloader': downloader,
+        'model': model,
+        'workers': workers or default_asr_workers(),
+        'batch_size': batch_size,
+        'language': language,
+    }
+    click.echo(f"ASR fallback enabled (model: {model}, workers: {_asr_settings['workers']})")
+
+
+def default_asr_workers() -> int:
+    """ASRワーカープロセス数の既定値
+    
+    プロセスごとにモデルを1つ読み込むため、CPUコア4つにつき1プロセスとし、
+    各プロセスは残りのコアをスレッドとして使う。
+    """
+    return max(1, (os.cpu_count() or 1) // 4)
+
+
+def find_audio_file(audio_dir: str, video_id: str) -> Optional[Path]:
+    """ディレクトリから {video_id}.* の音声ファイルを探す"""
+    matches = sorted(Path(audio_dir).glob(f"{video_id}.*"))
+    return matches[0] if matches else None
+
+
+def obtain_audio(video_id: str, work_dir: str) -> Path:
+    """ユーザー提供の音声ファイル、またはダウンローダーコマンドで音声を取得"""
+    if _asr_settings['audio_dir']:
+        audio_path = find_audio_file(_asr_settings['audio_dir'], video_id)
+        if audio_path:
+            return audio_path
+    
+    if _asr_settings['downloader']:
+        # テンプレート内の {url} {video_id} {output} を置換して実行（{output} は拡張子なしのパス）
+        output = os.path.join(work_dir, video_id)
+        command = _asr_settings['downloader'].format(
+            url=f"https://www.youtube.com/watch?v={video_id}", video_id=video_id, output=output
+        )
+        result = subprocess.run(shlex.split(command), capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Audio downloader failed: {result.stderr.strip()[-500:]}")
+        audio_path = find_audio_file(work_dir, video_id)
+        if audio_path:
+            return audio_path
+    
+    raise RuntimeError(f"No audio available for {video_id}")
+
+
+def load_audio(path: Path, sample_rate: int = ASR_SAMPLE_RATE) -> np.ndarray:
+    """ffmpeg で音声をモノラル float32 PCM にデコード"""
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError("ffmpeg not found. Install ffmpeg to use the ASR fallback.")
+    result = subprocess.run(
+        ["ffmpeg", "-nostdin", "-v", "error", "-i", str(path), "-f", "s16le", "-ac", "1", "-ar", str(sample_rate), "-"],
+        capture_output=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {result.stderr.decode(errors='replace').strip()[-500:]}")
+    return np.frombuffer(result.stdout, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def split_on_silence(audio: np.ndarray, sample_rate: int = ASR_SAMPLE_RATE, min_chunk: float = 10.0,
+                     max_chunk: float = 30.0, frame: float = 0.05) -> List[tuple[int, int]]:
+    """音声を無音部分で分割し、(開始サンプル, 終了サンプル) のリストを返す
+    
+    各チャンクは min_chunk〜max_chunk 秒の範囲で、その区間内で最も静かなフレームで区切る。
+    """
+    frame_len = max(1, int(frame * sample_rate))
+    n_frames = len(audio) // frame_len
+    if n_frames == 0:
+        return [(0, len(audio))] if len(audio) else []
+    
+    # フレームごとのRMSエネルギー
+    frames = audio[:n_frames * frame_len].reshape(n_frames, frame_len)
+    energy = np.sqrt(np.mean(frames ** 2, axis=1))
+    
+    min_frames = max(1, int(min_chunk / frame))
+    max_frames = max(min_frames + 1, int(max_chunk / frame))
+    
+    chunks = []
+    cursor = 0
+    while n_frames - cursor > max_frames:
+        window = energy[cursor + min_frames:cursor + max_frames]
+        cut = cursor + min_frames + int(np.argmin(window))
+        chunks.append((cursor * frame_len, cut * frame_len))
+        cursor = cut
+    chunks.append((cursor * frame_len, len(audio)))
+    return chunks
+
+
+def _init_asr_worker(model_name: str, cpu_threads: int) -> None:
+    """ワーカープロセスごとにASRモデルを1度だけ読み込む"""
+    global _asr_model
+    from faster_whisper import BatchedInferencePipeline, WhisperModel
+    model = WhisperModel(model_name, device="cpu", compute_type="int8", cpu_threads=cpu_threads)
+    _asr_model = BatchedInferencePipeline(model=model)
+
+
+def _transcribe_chunk_batch(offset: float, audio: np.ndarray, clips: List[Dict[str, int]],
+                            language: Optional[str], batch_size: int) -> List[Dict[str, Any]]:
+    """連続したチャンク群をバッチ推論で文字起こしし、元音声基準のタイムスタンプで返す
+    
+    clips は audio 内の各チャンクの開始・終了サンプル位置。
+    """
+    results, _ = _asr_model.transcribe(audio, language=language, clip_timestamps=clips, batch_size=batch_size)
+    segments = []
+    for seg in results:
+        text = seg.text.strip()
+        if text:
+            segments.append({
+                'text': text,
+                'start': round(offset + seg.start, 3),
+                'duration': round(seg.end - seg.start, 3),
+            })
+    return segments
+
+
+def _asr_warmup(barrier) -> None:
+    """全ワーカープロセスがモデルを読み込み終えるまで待機（ベンチマーク用）"""
+    barrier.wait()
+
+
+def warm_up_asr_executor(executor: ProcessPoolExecutor, workers: int) -> None:
+    """ワーカー数と同じ数のバリア待ちタスクを投入し、全プロセスの初期化完了を待つ
+    
+    各タスクは全員が揃うまでブロックするため、1つのプロセスが複数のタスクを
+    処理することはなく、全プロセスが起動・モデル読み込みを終えたことが保証される。
+    """
+    with multiprocessing.Manager() as manager:
+        barrier = manager.Barrier(workers)
+        for future in [executor.submit(_asr_warmup, barrier) for _ in range(workers)]:
+            future.result()
+
+
+def create_asr_executor(model_name: str, workers: int) -> ProcessPoolExecutor:
+    """CPUコアを分け合うASRワーカープロセスプールを作成"""
+    try:
+        from faster_whisper import BatchedInferencePipeline  # noqa: F401
+    except ImportError:
+        raise RuntimeError("faster-whisper>=1.1.0 not installed. Run: pip install -U faster-whisper")
+    cpu_threads = max(1, (os.cpu_count() or 1) // workers)
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_asr_worker, initargs=(model_name, cpu_threads))
+
+
+def transcribe_audio(audio: np.ndarray, executor: ProcessPoolExecutor, batch_size: int = 8,
+                     language: Optional[str] = None, sample_rate: int = ASR_SAMPLE_RATE) -> List[Dict[str, Any]]:
+    """音声を無音で分割し、batch_size 個ずつのチャンクを各プロセスでバッチ推論"""
+    chunks = split_on_silence(audio, sample_rate)
+    futures = []
+    for i in range(0, len(chunks), batch_size):
+        group = chunks[i:i + batch_size]
+        # チャンクは連続しているので、グループ全体の区間を1つの音声として渡す
+        group_start, group_end = group[0][0], group[-1][1]
+        clips = [{'start': start - group_start, 'end': end - group_start} for start, end in group]
+        futures.append(executor.submit(
+            _transcribe_chunk_batch, group_start / sample_rate, audio[group_start:group_end], clips,
+            language, batch_size
+        ))
+    
+    segments = []
+    for future in futures:
+        segments.extend(future.result())
+    return segments
+
+
+def transcribe_video_audio(video_id: str) -> List[Dict[str, Any]]:
+    """動画の音声をローカルASRで文字起こし"""
+    global _asr_executor
+    with _asr_executor_lock:
+        if _asr_executor is None:
+            _asr_executor = create_asr_executor(_asr_settings['model'], _asr_settings['workers'])
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        audio_path = obtain_audio(video_id, work_dir)
+        audio = load_audio(audio_path)
+    
+    segments = transcribe_audio(audio, _asr_executor, _asr_settings['batch_size'], _asr_settings['language'])
+    if not segments:
+        raise RuntimeError("ASR produced no speech segments")
+    return segments
+
+
 def ensure_parent_dir(path: str) -> None:
     parent = os.path.dirname(path)
     if parent and not os.path.exists(parent):
         os.makedirs(parent, exist_ok=True)
 
 
-def fetch_channel_transcripts(channel_name: str, output_dir: str, max_videos: Optional[int] = None, 
-                             fmt: str = "md", include_csv: bool = True, period: Optional[str] = None) -> None:
-    """チャンネルの全動画の文字起こしとCSVデータを取得"""
+CSV_HEADERS = [
+    'チェック', 'タイトル', '動画リンク', 'サムネイル画像', 'チャンネル名', 
+    '投稿日', '視聴回数', '高評価数', 'コメント数', '動画時間', 
+    'チャンネル登録者数', '拡散率', '視聴コメント率', '視聴高評価率', '視聴エンゲージメント率'
+]
+
+
+def process_video(video_id: str, channel_title: str, subscriber_count: int, output_path: Path,
+                  fmt: str = "md", log=click.echo, video_info: Optional[Dict[str, Any]] = None,
+                  raise_egress_errors: bool = False) -> tuple[Optional[List], bool]:
+    """1本の動画の情報取得・文字起こし保存を行い、(CSV行, 文字起こし成功可否) を返す
+    
+    raise_egress_errors が True の場合、IPブロック等による失敗は EgressBlockedError として送出する。
+    """
+    # 動画情報を取得（事前に一括取得済みでなければ個別に取得）
+    if not video_info:
+        video_info = get_video_info(video_id)
+    if not video_info or 'snippet' not in video_info:
+        log(f"⚠️  Skipping {video_id}: No video info available")
+        return None, False
+    
+    snippet = video_info['snippet']
+    statistics = video_info.get('statistics', {})
+    content_details = video_info.get('contentDetails', {})
+    
+    video_title = snippet.get('title', 'Unknown')
+    published_at = snippet.get('publishedAt', '')
+    
+    # 統計情報を取得
+    view_count = int(statistics.get('viewCount', 0))
+    like_count = int(statistics.get('likeCount', 0))
+    comment_count = int(statistics.get('commentCount', 0))
+    
+    # 動画時間を取得・変換
+    duration_iso = content_details.get('duration', 'PT0S')
+    duration_seconds = parse_duration(duration_iso)
+    duration_formatted = format_duration(duration_seconds)
+    
+    # エンゲージメント指標を計算
+    metrics = calculate_engagement_metrics(statistics, subscriber_count)
+    
+    # CSVデータを作成
+    csv_row = [
+        '',  # チェック（空欄）
+        video_title,
+        f"https://www.youtube.com/watch?v={video_id}",
+        f"https://i.ytimg.com/vi/{video_id}/maxresdefault.jpg",
+        channel_title,
+        datetime.fromisoformat(published_at.replace('Z', '+00:00')).strftime('%Y/%m/%d') if published_at else '',
+        view_count,
+        like_count,
+        comment_count,
+        duration_formatted,
+        subscriber_count,
+        metrics['spread_rate'],
+        metrics['comment_rate'],
+        metrics['like_rate'],
+        metrics['engagement_rate']
+    ]
+    
+    # 文字起こしを取得
+    try:
+        segments = fetch_transcript_segments(video_id)
+        transcript_text = " ".join([seg['text'] for seg in segments])
+        
+        # ファイル名を生成（安全な文字のみ使用）
+        safe_title = re.sub(r'[<>:"/\\|?*]', '_', video_title)[:50]
+        extension = "md" if fmt == "md" else "txt"
+        filename = f"{safe_title}_{video_id}.{extension}"
+        transcript_path = output_path / "transcripts" / filename
+        
+        # 出力フォーマット
+        url = f"https://www.youtube.com/watch?v={video_id}"
+        formatted_content = format_output(transcript_text, url, fmt, video_title)
+        
+        # ファイルに保存
+        with open(transcript_path, "w", encoding="utf-8") as f:
+            f.write(formatted_content)
+        
+        # セグメントのタイムスタンプを保存（export コマンドで利用）
+        segments_dir = output_path / "segments"
+        segments_dir.mkdir(exist_ok=True)
+        with open(segments_dir / f"{video_id}.json", "w", encoding="utf-8") as f:
+            json.dump(segments, f, ensure_ascii=False)
+        
+        log(f"✅ Saved transcript: {filename}")
+        return csv_row, True
+        
+    except Exception as transcript_error:
+        if raise_egress_errors and isinstance(transcript_error, EgressBlockedError):
+            raise
+        log(f"⚠️  Failed to get transcript for {video_id}: {transcript_error}")
+        # CSVデータは保持（文字起こしが失敗してもデータは有効）
+        return csv_row, False
+
+
+def write_analysis_files(output_path: Path, channel_title: str, csv_data: List) -> None:
+    """CSV・Excel分析データを保存"""
+    csv_path = output_path / "data" / f"{channel_title}_analysis.csv"
+    with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(CSV_HEADERS)
+        writer.writerows(csv_data)
+    
+    click.echo(f"📊 CSV saved: {csv_path}")
+    
+    # Excelファイルも生成
+    try:
+        excel_path = output_path / "data" / f"{channel_title}_analysis.xlsx"
+        df = pd.DataFrame(csv_data, columns=CSV_HEADERS)
+        df.to_excel(excel_path, index=False, engine='openpyxl')
+        click.echo(f"📈 Excel saved: {excel_path}")
+    except ImportError:
+        click.echo("⚠️  openpyxl not installed. Excel file not generated.")
+
+
+def resolve_channel_videos(channel_name: str, max_videos: Optional[int] = None,
+                           period: Optional[str] = None) -> Optional[tuple[str, int, List[str]]]:
+    """チャンネルを検索し、(チャンネル名, 登録者数, 処理対象の動画IDリスト) を返す"""
     click.echo(f"🔍 Searching for channel: {channel_name}")
     
     # チャンネルIDを取得
@@ -426,7 +1181,7 @@ def fetch_channel_transcripts(channel_name: str, output_dir: str, max_videos: Op
     
     if not video_ids:
         click.echo("❌ No videos found in this channel.")
-        return
+        return None
     
     click.echo(f"📹 Found {len(video_ids)} videos")
     
@@ -446,127 +1201,86 @@ def fetch_channel_transcripts(channel_name: str, output_dir: str, max_videos: Op
         video_ids = video_ids[:max_videos]
         click.echo(f"📹 Processing {len(video_ids)} videos (user limit applied)")
     
+    return channel_title, subscriber_count, video_ids
+
+
+def fetch_channel_transcripts(channel_name: str, output_dir: str, max_videos: Optional[int] = None, 
+                             fmt: str = "md", include_csv: bool = True, period: Optional[str] = None,
+                             filter_expression: Optional[str] = None, order_by: Optional[str] = None,
+                             top: Optional[int] = None, short_max_seconds: int = 180) -> None:
+    """チャンネルの全動画の文字起こしとCSVデータを取得"""
+    resolved = resolve_channel_videos(channel_name, max_videos, period)
+    if resolved is None:
+        return
+    channel_title, subscriber_count, video_ids = resolved
+    
+    # 文字起こしの前にメタデータで対象動画を絞り込む
+    video_ids, video_infos = select_videos(video_ids, subscriber_count, filter_expression, order_by, top,
+                                           short_max_seconds)
+    if not video_ids:
+        click.echo("❌ No videos matched the selection.")
+        return
+    
     # 出力ディレクトリを作成
     output_path = create_output_directory(output_dir, channel_name)
     click.echo(f"📁 Output directory: {output_path}")
     
-    # CSVデータ用のリスト
-    csv_data = []
-    csv_headers = [
-        'チェック', 'タイトル', '動画リンク', 'サムネイル画像', 'チャンネル名', 
-        '投稿日', '視聴回数', '高評価数', 'コメント数', '動画時間', 
-        'チャンネル登録者数', '拡散率', '視聴コメント率', '視聴高評価率', '視聴エンゲージメント率'
-    ]
+    # 動画ごとのCSV行（並列処理でも元の順序を保つ）
+    csv_rows: List[Optional[List]] = [None] * len(video_ids)
     
     successful_transcripts = 0
     failed_transcripts = 0
     
-    # プログレスバーで各動画を処理
+    def run(video_id: str, log) -> tuple[Optional[List], bool]:
+        result = process_video(
+            video_id, channel_title, subscriber_count, output_path, fmt, log=log,
+            video_info=video_infos.get(video_id)
+        )
+        # API制限を考慮して少し待機
+        time.sleep(0.3)
+        return result
+    
+    def record(i: int, call, pbar) -> None:
+        nonlocal successful_transcripts, failed_transcripts
+        try:
+            csv_row, transcript_ok = call()
+            if csv_row is None:
+                failed_transcripts += 1
+            else:
+                csv_rows[i] = csv_row
+                if transcript_ok:
+                    successful_transcripts += 1
+        except Exception as e:
+            pbar.write(f"❌ Failed to process {video_ids[i]}: {e}")
+            failed_transcripts += 1
+        
+        pbar.update(1)
+    
+    concurrency = transcript_concurrency()
     with tqdm(total=len(video_ids), desc="Processing videos") as pbar:
-        for i, video_id in enumerate(video_ids, 1):
+        if concurrency == 1:
+            # プロキシプールがなければ1本ずつ順番に処理
+            for i, video_id in enumerate(video_ids):
+                pbar.set_description(f"Processing video {i + 1}/{len(video_ids)}")
+                record(i, lambda: run(video_id, pbar.write), pbar)
+        else:
+            # プロキシプールがあればエンドポイントの同時実行上限の合計まで並列に処理
+            executor = ThreadPoolExecutor(max_workers=concurrency)
             try:
-                pbar.set_description(f"Processing video {i}/{len(video_ids)}")
-                
-                # 動画情報を取得
-                video_info = get_video_info(video_id)
-                if not video_info or 'snippet' not in video_info:
-                    pbar.write(f"⚠️  Skipping {video_id}: No video info available")
-                    failed_transcripts += 1
-                    pbar.update(1)
-                    continue
-                
-                snippet = video_info['snippet']
-                statistics = video_info.get('statistics', {})
-                content_details = video_info.get('contentDetails', {})
-                
-                video_title = snippet.get('title', 'Unknown')
-                published_at = snippet.get('publishedAt', '')
-                
-                # 統計情報を取得
-                view_count = int(statistics.get('viewCount', 0))
-                like_count = int(statistics.get('likeCount', 0))
-                comment_count = int(statistics.get('commentCount', 0))
-                
-                # 動画時間を取得・変換
-                duration_iso = content_details.get('duration', 'PT0S')
-                duration_seconds = parse_duration(duration_iso)
-                duration_formatted = format_duration(duration_seconds)
-                
-                # エンゲージメント指標を計算
-                metrics = calculate_engagement_metrics(statistics, subscriber_count)
-                
-                # CSVデータを追加
-                csv_row = [
-                    '',  # チェック（空欄）
-                    video_title,
-                    f"https://www.youtube.com/watch?v={video_id}",
-                    f"https://i.ytimg.com/vi/{video_id}/maxresdefault.jpg",
-                    channel_title,
-                    datetime.fromisoformat(published_at.replace('Z', '+00:00')).strftime('%Y/%m/%d') if published_at else '',
-                    view_count,
-                    like_count,
-                    comment_count,
-                    duration_formatted,
-                    subscriber_count,
-                    metrics['spread_rate'],
-                    metrics['comment_rate'],
-                    metrics['like_rate'],
-                    metrics['engagement_rate']
-                ]
-                csv_data.append(csv_row)
-                
-                # 文字起こしを取得
-                try:
-                    transcript_text = fetch_transcript(video_id)
-                    
-                    # ファイル名を生成（安全な文字のみ使用）
-                    safe_title = re.sub(r'[<>:"/\\|?*]', '_', video_title)[:50]
-                    extension = "md" if fmt == "md" else "txt"
-                    filename = f"{safe_title}_{video_id}.{extension}"
-                    transcript_path = output_path / "transcripts" / filename
-                    
-                    # 出力フォーマット
-                    url = f"https://www.youtube.com/watch?v={video_id}"
-                    formatted_content = format_output(transcript_text, url, fmt, video_title)
-                    
-                    # ファイルに保存
-                    with open(transcript_path, "w", encoding="utf-8") as f:
-                        f.write(formatted_content)
-                    
-                    successful_transcripts += 1
-                    pbar.write(f"✅ Saved transcript: {filename}")
-                    
-                except Exception as transcript_error:
-                    pbar.write(f"⚠️  Failed to get transcript for {video_id}: {transcript_error}")
-                    # CSVデータは保持（文字起こしが失敗してもデータは有効）
-                
-                # API制限を考慮して少し待機
-                time.sleep(0.3)
-                
-            except Exception as e:
-                pbar.write(f"❌ Failed to process {video_id}: {e}")
-                failed_transcripts += 1
-            
-            pbar.update(1)
+                futures = {executor.submit(run, video_id, pbar.write): i for i, video_id in enumerate(video_ids)}
+                for future in as_completed(futures):
+                    record(futures[future], future.result, pbar)
+            except KeyboardInterrupt:
+                # 未着手の動画は破棄し、処理中の動画の完了だけを待つ
+                executor.shutdown(cancel_futures=True)
+                raise
+            executor.shutdown()
+    
+    csv_data = [csv_row for csv_row in csv_rows if csv_row is not None]
     
     # CSVファイルを保存
     if include_csv and csv_data:
-        csv_path = output_path / "data" / f"{channel_title}_analysis.csv"
-        with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(csv_headers)
-            writer.writerows(csv_data)
-        
-        click.echo(f"📊 CSV saved: {csv_path}")
-        
-        # Excelファイルも生成
-        try:
-            excel_path = output_path / "data" / f"{channel_title}_analysis.xlsx"
-            df = pd.DataFrame(csv_data, columns=csv_headers)
-            df.to_excel(excel_path, index=False, engine='openpyxl')
-            click.echo(f"📈 Excel saved: {excel_path}")
-        except ImportError:
-            click.echo("⚠️  openpyxl not installed. Excel file not generated.")
+        write_analysis_files(output_path, channel_title, csv_data)
     
     # サマリーレポートを生成
     generate_summary_report(output_path, channel_title, len(video_ids), successful_transcripts, failed_transcripts, csv_data)
@@ -655,6 +1369,7 @@ def generate_summary_report(output_path: Path, channel_name: str, total_videos:
 ```
 {output_path.name}/
 ├── transcripts/          # 文字起こしファイル
+├── segments/             # タイムスタンプ付きセグメント（JSON）
 ├── data/                 # CSV・Excelデータ
 │   ├── {channel_name}_analysis.csv
 │   └── {channel_name}_analysis.xlsx
@@ -695,6 +1410,640 @@ def format_output(text: str, url: str, fmt: str, title: str = None) -> str:
     )
 
 
+class SQLiteWorkQueue:
+    """共有ストレージ上のSQLiteファイルを使ったリース方式のワークキュー
+    
+    coordinator が動画IDを投入し、複数の worker が期限付きリースで1本ずつ取得する。
+    リースはハートビートで延長され、期限切れ（ワーカーのクラッシュ等）になると
+    他のワーカーが再取得できる。別のバックエンドに差し替える場合は同じメソッドを実装する。
+    """
+    
+    def __init__(self, path: str, timeout: float = 30.0):
+        self.path = path
+        ensure_parent_dir(path)
+        # isolation_level=None で自動トランザクションを無効化し、BEGIN IMMEDIATE で明示的にロックする
+        self._conn = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            CREATE TABLE IF NOT EXISTS videos (
+                video_id TEXT PRIMARY KEY,
+                position INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                csv_row TEXT,
+                transcript_ok INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                video_info TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_videos_status ON videos (status, position);
+        """)
+        # video_info 列がない古いキューファイルを移行
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(videos)")]
+        if 'video_info' not in columns:
+            self._conn.execute("ALTER TABLE videos ADD COLUMN video_info TEXT")
+    
+    def _transaction(self, fn):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._conn)
+                self._conn.execute("COMMIT")
+                return result
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+    
+    def close(self) -> None:
+        self._conn.close()
+    
+    def set_meta(self, values: Dict[str, Any]) -> None:
+        """ジョブ共通の設定（チャンネル名・出力先など）を保存"""
+        def op(conn):
+            conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [(k, json.dumps(v, ensure_ascii=False)) for k, v in values.items()]
+            )
+        self._transaction(op)
+    
+    def get_meta(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._conn.execute("SELECT key, value FROM meta").fetchall()
+        return {k: json.loads(v) for k, v in rows}
+    
+    def enqueue(self, video_ids: List[str], video_infos: Optional[Dict[str, Dict[str, Any]]] = None) -> int:
+        """動画IDを投入（既に存在するIDは無視）し、追加件数を返す
+        
+        video_infos を渡すと一括取得済みの動画情報も保存し、ワーカーでの再取得を省く。
+        """
+        video_infos = video_infos or {}
+        
+        def op(conn):
+            start = conn.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM videos").fetchone()[0]
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO videos (video_id, position, video_info) VALUES (?, ?, ?)",
+                [(video_id, start + i,
+                  json.dumps(video_infos[video_id], ensure_ascii=False) if video_id in video_infos else None)
+                 for i, video_id in enumerate(video_ids)]
+            )
+            return conn.total_changes - before
+        return self._transaction(op)
+    
+    def claim(self, worker_id: str, lease_seconds: float, max_attempts: int = 3) -> Optional[str]:
+        """未処理またはリース期限切れの動画を1本取得してリースする"""
+        def op(conn):
+            now = time.time()
+            # 試行回数を使い切った期限切れリースは失敗として確定
+            conn.execute(
+                "UPDATE videos SET status = 'failed', worker = NULL, error = 'lease expired too many times' "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, max_attempts)
+            )
+            row = conn.execute(
+                "SELECT video_id FROM videos "
+                "WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?) "
+                "ORDER BY position LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE videos SET status = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1 "
+                "WHERE video_id = ?",
+                (worker_id, now + lease_seconds, row[0])
+            )
+            return row[0]
+        return self._transaction(op)
+    
+    def video_info(self, video_id: str) -> Optional[Dict[str, Any]]:
+        """投入時に保存された動画情報を返す（なければ None）"""
+        with self._lock:
+            row = self._conn.execute("SELECT video_info FROM videos WHERE video_id = ?", (video_id,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+    
+    def heartbeat(self, video_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """リースを延長（他のワーカーに奪われていた場合は False）"""
+        def op(conn):
+            cur = conn.execute(
+                "UPDATE videos SET lease_expires = ? WHERE video_id = ? AND worker = ? AND status = 'leased'",
+                (time.time() + lease_seconds, video_id, worker_id)
+            )
+            return cur.rowcount == 1
+        return self._transaction(op)
+    
+    def complete(self, video_id: str, worker_id: str, csv_row: Optional[List], transcript_ok: bool,
+                 error: Optional[str] = None) -> bool:
+        """処理結果を記録してリースを完了（csv_row が None の場合は失敗として記録）"""
+        status = 'done' if csv_row is not None else 'failed'
+        
+        def op(conn):
+            cur = conn.execute(
+                "UPDATE videos SET status = ?, worker = NULL, lease_expires = NULL, csv_row = ?, "
+                "transcript_ok = ?, error = ? WHERE video_id = ? AND worker = ? AND status = 'leased'",
+                (status, json.dumps(csv_row, ensure_ascii=False) if csv_row is not None else None,
+                 int(transcript_ok), error, video_id, worker_id)
+            )
+            return cur.rowcount == 1
+        return self._transaction(op)
+    
+    def release(self, video_id: str, worker_id: str) -> None:
+        """リースを返却して他のワーカーが即座に再取得できるようにする"""
+        def op(conn):
+            conn.execute(
+                "UPDATE videos SET status = 'pending', worker = NULL, lease_expires = NULL "
+                "WHERE video_id = ? AND worker = ? AND status = 'leased'",
+                (video_id, worker_id)
+            )
+        self._transaction(op)
+    
+    def release_workers(self, worker_ids: List[str]) -> int:
+        """指定ワーカーが保持しているリースをすべて返却し、返却件数を返す"""
+        def op(conn):
+            cur = conn.executemany(
+                "UPDATE videos SET status = 'pending', worker = NULL, lease_expires = NULL "
+                "WHERE worker = ? AND status = 'leased'",
+                [(worker_id,) for worker_id in worker_ids]
+            )
+            return cur.rowcount
+        return self._transaction(op)
+    
+    def progress(self) -> Dict[str, int]:
+        """ステータスごとの件数を返す"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM videos GROUP BY status").fetchall()
+        counts = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        counts.update(dict(rows))
+        return counts
+    
+    def results(self) -> List[tuple[List, bool]]:
+        """完了した動画の (CSV行, 文字起こし成功可否) を投入順で返す"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT csv_row, transcript_ok FROM videos WHERE status = 'done' ORDER BY position"
+            ).fetchall()
+        return [(json.loads(csv_row), bool(transcript_ok)) for csv_row, transcript_ok in rows]
+
+
+def open_work_queue(path: str) -> SQLiteWorkQueue:
+    """ワークキューを開く"""
+    return SQLiteWorkQueue(path)
+
+
+def queue_is_drained(counts: Dict[str, int]) -> bool:
+    """未処理・処理中の動画が残っていないか"""
+    return counts['pending'] == 0 and counts['leased'] == 0
+
+
+def enqueue_channel_sweep(queue: SQLiteWorkQueue, channel_name: str, output_dir: str,
+                          max_videos: Optional[int] = None, fmt: str = "md", include_csv: bool = True,
+                          period: Optional[str] = None, filter_expression: Optional[str] = None,
+                          order_by: Optional[str] = None, top: Optional[int] = None,
+                          short_max_seconds: int = 180) -> Dict[str, Any]:
+    """チャンネルの動画リストをワークキューに投入（既存ジョブがあれば再開）"""
+    selection = {
+        'max_videos': max_videos,
+        'period': period,
+        'filter': filter_expression,
+        'order_by': order_by,
+        'top': top,
+        'short_max_seconds': short_max_seconds if filter_expression else None,
+    }
+    
+    meta = queue.get_meta()
+    if meta:
+        # 別のチャンネル・選択条件のジョブを誤って再開しないよう確認
+        if meta['channel_name'] != channel_name:
+            raise click.ClickException(
+                f"Queue {queue.path} already holds a sweep for '{meta['channel_name']}', not '{channel_name}'"
+            )
+        stored = meta.get('selection', {})
+        mismatched = [key for key, value in selection.items()
+                      if value is not None and key in stored and stored[key] != value]
+        if mismatched:
+            raise click.ClickException(
+                f"Queue {queue.path} was created with different selection options: {', '.join(mismatched)}"
+            )
+        click.echo(f"♻️  Resuming existing sweep: {meta['channel_title']} ({meta['output_path']})")
+        return meta
+    
+    resolved = resolve_channel_videos(channel_name, max_videos, period)
+    if resolved is None:
+        return {}
+    channel_title, subscriber_count, video_ids = resolved
+    
+    # ワーカーに渡す前にメタデータで対象動画を絞り込む
+    video_ids, video_infos = select_videos(video_ids, subscriber_count, filter_expression, order_by, top,
+                                           short_max_seconds)
+    if not video_ids:
+        click.echo("❌ No videos matched the selection.")
+        return {}
+    
+    output_path = create_output_directory(output_dir, channel_name)
+    click.echo(f"📁 Output directory: {output_path}")
+    
+    meta = {
+        'channel_name': channel_name,
+        'channel_title': channel_title,
+        'subscriber_count': subscriber_count,
+        # ワーカーは別の作業ディレクトリ・ホストで動くため絶対パスで保存
+        'output_path': str(output_path.resolve()),
+        'fmt': fmt,
+        'include_csv': include_csv,
+        'selection': selection,
+    }
+    # メタ情報より先に動画を投入し、ワーカーが空のジョブを完了と誤認しないようにする
+    added = queue.enqueue(video_ids, video_infos)
+    queue.set_meta(meta)
+    click.echo(f"📥 Enqueued {added} videos to {queue.path}")
+    return meta
+
+
+def assemble_sweep_results(queue: SQLiteWorkQueue, meta: Dict[str, Any]) -> None:
+    """全リース完了後にCSV/Excel/サマリーレポートを生成"""
+    output_path = Path(meta['output_path'])
+    channel_title = meta['channel_title']
+    counts = queue.progress()
+    results = queue.results()
+    
+    csv_data = [csv_row for csv_row, _ in results]
+    successful_transcripts = sum(1 for _, transcript_ok in results if transcript_ok)
+    failed_transcripts = counts['failed']
+    total_videos = sum(counts.values())
+    
+    if meta.get('include_csv', True) and csv_data:
+        write_analysis_files(output_path, channel_title, csv_data)
+    
+    generate_summary_report(output_path, channel_title, total_videos, successful_transcripts, failed_transcripts, csv_data)
+    
+    click.echo(f"\n🎉 Completed!")
+    click.echo(f"📊 Total videos: {total_videos}")
+    click.echo(f"✅ Successful transcripts: {successful_transcripts}")
+    click.echo(f"❌ Failed transcripts: {failed_transcripts}")
+    click.echo(f"📁 Output directory: {output_path}")
+
+
+def wait_for_sweep(queue: SQLiteWorkQueue, poll_interval: float = 5.0) -> None:
+    """ワーカーが全動画を処理し終えるまで進捗を表示しながら待機"""
+    counts = queue.progress()
+    total = sum(counts.values())
+    with tqdm(total=total, desc="Waiting for workers") as pbar:
+        while True:
+            counts = queue.progress()
+            finished = counts['done'] + counts['failed']
+            pbar.update(finished - pbar.n)
+            pbar.set_postfix(pending=counts['pending'], leased=counts['leased'])
+            if queue_is_drained(counts):
+                break
+            time.sleep(poll_interval)
+
+
+def run_sweep_worker(queue: SQLiteWorkQueue, worker_id: str, lease_seconds: float = 120.0,
+                     max_attempts: int = 3, poll_interval: float = 5.0) -> int:
+    """キューから動画を取得して処理するワーカーループ。処理した本数を返す"""
+    # coordinator がメタ情報を書き込むまで待機
+    meta = queue.get_meta()
+    while not meta:
+        click.echo("⏳ Waiting for coordinator to enqueue videos...")
+        time.sleep(poll_interval)
+        meta = queue.get_meta()
+    
+    output_path = Path(meta['output_path'])
+    (output_path / "transcripts").mkdir(parents=True, exist_ok=True)
+    
+    # プロキシプールがあればエンドポイントの同時実行上限の合計だけスロットを起動
+    concurrency = transcript_concurrency()
+    click.echo(f"👷 Worker {worker_id} started for {meta['channel_title']} ({concurrency} slot(s))")
+    stop = threading.Event()
+    if concurrency == 1:
+        processed = _run_worker_slot(queue, meta, worker_id, lease_seconds, max_attempts, poll_interval, stop)
+    else:
+        # リースはスロット単位で保持するため、スロットごとに別のIDを使う
+        slot_ids = [f"{worker_id}/{slot}" for slot in range(concurrency)]
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        try:
+            futures = [
+                executor.submit(_run_worker_slot, queue, meta, slot_id, lease_seconds, max_attempts,
+                                poll_interval, stop)
+                for slot_id in slot_ids
+            ]
+            processed = sum(future.result() for future in futures)
+        except KeyboardInterrupt:
+            # Ctrl-C はメインスレッドにしか届かないため、各スロットに停止を通知してリースを返却
+            stop.set()
+            released = queue.release_workers(slot_ids)
+            click.echo(f"🛑 Worker {worker_id} interrupted: released {released} lease(s)", err=True)
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        executor.shutdown()
+    
+    click.echo(f"🏁 Worker {worker_id} finished: processed {processed} videos")
+    return processed
+
+
+def _run_worker_slot(queue: SQLiteWorkQueue, meta: Dict[str, Any], worker_id: str, lease_seconds: float,
+                     max_attempts: int, poll_interval: float, stop: threading.Event) -> int:
+    """stop が通知されるまで1本ずつ動画をリースして処理するループ。処理した本数を返す"""
+    output_path = Path(meta['output_path'])
+    processed = 0
+    while not stop.is_set():
+        video_id = queue.claim(worker_id, lease_seconds, max_attempts)
+        if video_id is None:
+            if queue_is_drained(queue.progress()):
+                break
+            # 他ワーカーのリースが残っている間は、期限切れによる再取得に備えて待機
+            stop.wait(poll_interval)
+            continue
+        
+        # リース期間の1/3ごとにハートビートを送る
+        stop_heartbeat = threading.Event()
+        
+        def heartbeat_loop(video_id=video_id):
+            interval = lease_seconds / 3
+            while not stop_heartbeat.wait(interval):
+                try:
+                    renewed = queue.heartbeat(video_id, worker_id, lease_seconds)
+                except sqlite3.Error as e:
+                    # 共有ストレージ上でロックされている場合などは間隔を詰めて再試行
+                    click.echo(f"⚠️  Heartbeat failed for {video_id}: {e}; retrying", err=True)
+                    interval = min(lease_seconds / 3, 5.0)
+                    continue
+                interval = lease_seconds / 3
+                if not renewed:
+                    click.echo(f"⚠️  Lease lost for {video_id}", err=True)
+                    break
+        
+        heartbeat = threading.Thread(target=heartbeat_loop, daemon=True)
+        heartbeat.start()
+        finished = False
+        try:
+            csv_row, transcript_ok = process_video(
+                video_id, meta['channel_title'], meta['subscriber_count'], output_path, meta['fmt'],
+                video_info=queue.video_info(video_id), raise_egress_errors=True
+            )
+            error = None if csv_row is not None else "No video info available"
+            completed = queue.complete(video_id, worker_id, csv_row, transcript_ok, error)
+            finished = True
+            if completed:
+                processed += 1
+        except EgressBlockedError as e:
+            # ブロックは一時的なものなので失敗として確定せず、リースを返却して後で再試行させる
+            click.echo(f"⚠️  Blocked while processing {video_id}: {e}; releasing lease", err=True)
+            completed = True  # finished が False のため finally でリースを返却する
+        except Exception as e:
+            click.echo(f"❌ Failed to process {video_id}: {e}", err=True)
+            completed = queue.complete(video_id, worker_id, None, False, str(e))
+            finished = True
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+            # KeyboardInterrupt 等で中断された場合はリースを返却
+            if not finished:
+                queue.release(video_id, worker_id)
+        
+        if not completed:
+            # リース期限切れで他のワーカーに再割り当てされたため、この結果は記録しない
+            click.echo(f"⚠️  Discarded result for {video_id}: lease was lost", err=True)
+        
+        # API制限を考慮して少し待機
+        time.sleep(0.3)
+    
+    return processed
+
+
+CSV_EXPORT_COLUMNS = {
+    'タイトル': 'title',
+    'チャンネル名': 'channel',
+    '投稿日': 'published',
+    '視聴回数': 'views',
+    '高評価数': 'likes',
+    'コメント数': 'comments',
+    '動画時間': 'duration',
+    'チャンネル登録者数': 'subscribers',
+    '拡散率': 'spread_rate',
+    '視聴コメント率': 'comment_rate',
+    '視聴高評価率': 'like_rate',
+    '視聴エンゲージメント率': 'engagement_rate',
+}
+
+
+def parse_clock_duration(value: str) -> Optional[int]:
+    """HH:MM:SS / MM:SS 形式を秒数に変換"""
+    try:
+        parts = [int(p) for p in str(value).split(':')]
+    except ValueError:
+        return None
+    seconds = 0
+    for part in parts:
+        seconds = seconds * 60 + part
+    return seconds
+
+
+def parse_transcript_file(path: Path) -> tuple[str, Optional[str]]:
+    """format_output で保存された文字起こしファイルから (本文, タイトル) を取り出す"""
+    content = path.read_text(encoding='utf-8')
+    if path.suffix != '.md' or not content.startswith("# YouTube Transcript\n"):
+        return content, None
+    header, _, body = content.partition("\n---\n\n")
+    title_match = re.search(r'^\*\*Title:\*\* (.*)$', header, re.MULTILINE)
+    return body.rstrip('\n'), title_match.group(1) if title_match else None
+
+
+def find_run_directories(paths: List[str]) -> List[Path]:
+    """指定パス（実行ディレクトリまたはその親）から transcripts/ を持つ実行ディレクトリを列挙"""
+    runs = []
+    for p in paths:
+        path = Path(p)
+        if (path / "transcripts").is_dir():
+            runs.append(path)
+        else:
+            runs.extend(sorted(child for child in path.iterdir() if (child / "transcripts").is_dir()))
+    return runs
+
+
+def run_timestamp(run_dir: Path) -> str:
+    """実行ディレクトリ名の _%Y%m%d_%H%M%S サフィックス（なければ更新日時、不明なら空文字）を返す"""
+    match = re.search(r'_(\d{8}_\d{6})$', run_dir.name)
+    if match:
+        return match.group(1)
+    if not run_dir.exists():
+        return ''
+    return datetime.fromtimestamp(run_dir.stat().st_mtime).strftime("%Y%m%d_%H%M%S")
+
+
+def collect_run_records(run_dir: Path, skip_ids: set) -> List[Dict[str, Any]]:
+    """実行ディレクトリの文字起こし・分析CSV・セグメントを動画ごとのレコードにまとめる"""
+    # 分析CSVを動画IDで引けるようにする
+    metadata: Dict[str, Dict[str, Any]] = {}
+    for csv_path in sorted((run_dir / "data").glob("*_analysis.csv")):
+        with open(csv_path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                video_id = extract_video_id(row.get('動画リンク', ''))
+                if video_id:
+                    metadata[video_id] = {key: row.get(col) for col, key in CSV_EXPORT_COLUMNS.items()}
+    
+    def to_int(value):
+        return int(float(value)) if value not in (None, '') else None
+    
+    def to_float(value):
+        return float(value) if value not in (None, '') else None
+    
+    records = []
+    for transcript_path in sorted((run_dir / "transcripts").iterdir()):
+        if transcript_path.suffix not in ('.md', '.txt'):
+            continue
+        # ファイル名は {タイトル}_{動画ID}.{拡張子}（動画IDは11文字）
+        video_id = transcript_path.stem[-11:]
+        if video_id in skip_ids:
+            continue
+        
+        text, title = parse_transcript_file(transcript_path)
+        meta = metadata.get(video_id, {})
+        
+        segments = None
+        segments_path = run_dir / "segments" / f"{video_id}.json"
+        if segments_path.exists():
+            with open(segments_path, encoding='utf-8') as f:
+                segments = json.load(f)
+        
+        records.append({
+            'video_id': video_id,
+            'title': meta.get('title') or title,
+            'url': f"https://www.youtube.com/watch?v={video_id}",
+            'channel': meta.get('channel'),
+            'published': meta.get('published') or None,
+            'views': to_int(meta.get('views')),
+            'likes': to_int(meta.get('likes')),
+            'comments': to_int(meta.get('comments')),
+            'duration_seconds': parse_clock_duration(meta['duration']) if meta.get('duration') else None,
+            'subscribers': to_int(meta.get('subscribers')),
+            'spread_rate': to_float(meta.get('spread_rate')),
+            'comment_rate': to_float(meta.get('comment_rate')),
+            'like_rate': to_float(meta.get('like_rate')),
+            'engagement_rate': to_float(meta.get('engagement_rate')),
+            'run_dir': str(run_dir),
+            'transcript': text,
+            'segments': segments,
+        })
+        skip_ids.add(video_id)
+    return records
+
+
+def export_corpus(run_paths: List[str], output: str, rebuild: bool = False) -> None:
+    """実行ディレクトリ群を1つのArrow IPC（Feather v2）ファイルに書き出す
+    
+    既存の出力ファイルはメモリマップで読み込み、未登録の動画を追記する。既に登録済みの動画は、
+    登録元より新しい実行ディレクトリに含まれる場合のみ置き換える。
+    メモリマップでのゼロコピー読み込みを妨げないよう、圧縮はしない。
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+    except ImportError:
+        raise click.ClickException("pyarrow not installed. Run: pip install pyarrow")
+    
+    schema = pa.schema([
+        ('video_id', pa.string()),
+        ('title', pa.string()),
+        ('url', pa.string()),
+        ('channel', pa.string()),
+        ('published', pa.string()),
+        ('views', pa.int64()),
+        ('likes', pa.int64()),
+        ('comments', pa.int64()),
+        ('duration_seconds', pa.int64()),
+        ('subscribers', pa.int64()),
+        ('spread_rate', pa.float64()),
+        ('comment_rate', pa.float64()),
+        ('like_rate', pa.float64()),
+        ('engagement_rate', pa.float64()),
+        ('run_dir', pa.string()),
+        ('transcript', pa.large_string()),
+        ('segments', pa.list_(pa.struct([
+            ('text', pa.string()),
+            ('start', pa.float64()),
+            ('duration', pa.float64()),
+        ]))),
+    ])
+    
+    # 既存ファイルをメモリマップで読み込み（ゼロコピー）
+    existing = None
+    exported_runs: Dict[str, str] = {}  # 動画ID → 書き出し元の実行タイムスタンプ
+    if os.path.exists(output) and not rebuild:
+        existing = pa.ipc.open_file(pa.memory_map(output, 'r')).read_all()
+        if existing.schema != schema:
+            raise click.ClickException(f"Schema of {output} does not match; re-run with --rebuild")
+        exported_runs = {
+            video_id: run_timestamp(Path(run_dir))
+            for video_id, run_dir in zip(existing.column('video_id').to_pylist(),
+                                         existing.column('run_dir').to_pylist())
+        }
+        click.echo(f"📦 Existing corpus: {existing.num_rows} videos")
+    
+    # 新しい実行ディレクトリの内容を優先するため、新しい順に処理
+    runs = sorted(find_run_directories(run_paths), key=run_timestamp, reverse=True)
+    batches = []
+    collected_ids: set = set()
+    for run_dir in tqdm(runs, desc="Collecting runs"):
+        # 既存の行は、それより新しい実行に同じ動画がある場合のみ置き換える
+        timestamp = run_timestamp(run_dir)
+        skip_ids = collected_ids | {video_id for video_id, ts in exported_runs.items() if ts >= timestamp}
+        records = collect_run_records(run_dir, skip_ids)
+        if records:
+            collected_ids.update(record['video_id'] for record in records)
+            batches.append(pa.RecordBatch.from_pylist(records, schema=schema))
+    
+    replaced_ids = collected_ids & exported_runs.keys()
+    added = len(collected_ids) - len(replaced_ids)
+    if not collected_ids and existing is not None:
+        click.echo("✅ Corpus is up to date")
+        return
+    
+    if replaced_ids:
+        keep = pc.invert(pc.is_in(existing.column('video_id'), value_set=pa.array(sorted(replaced_ids))))
+        existing = existing.filter(keep)
+    
+    # 一時ファイルに書き出してから置き換える
+    ensure_parent_dir(output)
+    tmp_path = f"{output}.tmp"
+    try:
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, schema) as writer:
+                if existing is not None:
+                    writer.write_table(existing)
+                for batch in batches:
+                    writer.write_batch(batch)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    del existing
+    os.replace(tmp_path, output)
+    
+    click.echo(f"📦 Exported {added} new videos and replaced {len(replaced_ids)} from newer runs in {output}")
+
+
+def asr_options(f):
+    """ローカルASRフォールバック関連の共通オプション"""
+    options = [
+        click.option("--asr-fallback", is_flag=True, help="Transcribe caption-less videos with a local CPU ASR model (requires faster-whisper and ffmpeg)"),
+        click.option("--audio-dir", type=click.Path(file_okay=False), help="Directory containing <video_id>.* audio files for ASR fallback"),
+        click.option("--audio-downloader", help="Command template to fetch audio, e.g. 'yt-dlp -x -o \"{output}.%(ext)s\" {url}'"),
+        click.option("--asr-model", default="small", help="ASR model name or path"),
+        click.option("--asr-workers", type=click.IntRange(min=1), help="Number of parallel ASR decoding processes; each loads its own model copy (default: CPU count / 4)"),
+        click.option("--asr-batch-size", type=click.IntRange(min=1), default=8, help="Audio chunks decoded per batched inference call"),
+        click.option("--asr-language", default=None, help="Spoken language for ASR, e.g. 'ja' (default: auto-detect)"),
+    ]
+    for option in reversed(options):
+        f = option(f)
+    return f
+
+
 @click.group()
 def cli():
     """YouTube Transcriber - 動画やチャンネルの文字起こしツール"""
@@ -705,13 +2054,24 @@ def cli():
 @click.argument("url")
 @click.option("--output", "output_path", default="output/transcript.md", help="Output file path")
 @click.option("--format", "fmt", type=click.Choice(["md", "txt"]), default="md", help="Output format")
-def video(url: str, output_path: str, fmt: str) -> None:
+@click.option("--proxy", "proxies", multiple=True, help="Proxy URL for transcript fetches (repeatable; 'direct' = no proxy). Defaults to TRANSCRIPT_PROXIES")
+@click.option("--proxy-concurrency", type=click.IntRange(min=1), default=2, help="Maximum concurrent transcript fetches per proxy")
+@asr_options
+def video(url: str, output_path: str, fmt: str, proxies: tuple, proxy_concurrency: int, asr_fallback: bool,
+          audio_dir: Optional[str], audio_downloader: Optional[str], asr_model: str,
+          asr_workers: Optional[int], asr_batch_size: int, asr_language: Optional[str]) -> None:
     """単一の動画を文字起こし"""
     video_id = extract_video_id(url)
     if not video_id:
         raise click.ClickException("Invalid YouTube URL or ID")
 
-    text = fetch_transcript(video_id)
+    configure_egress_pool(proxies, proxy_concurrency)
+    configure_asr_fallback(asr_fallback, audio_dir, audio_downloader, asr_model, asr_workers,
+                           asr_batch_size, asr_language)
+    try:
+        text = fetch_transcript(video_id)
+    finally:
+        report_egress_stats()
     ensure_parent_dir(output_path)
     body = format_output(text, url, fmt)
     with open(output_path, "w", encoding="utf-8") as f:
@@ -727,12 +2087,135 @@ def video(url: str, output_path: str, fmt: str) -> None:
 @click.option("--period", type=click.Choice(["3months", "6months", "1year", "all"]), help="Time period to fetch videos from")
 @click.option("--no-csv", is_flag=True, help="Skip CSV/Excel generation")
 @click.option("--transcripts-only", is_flag=True, help="Generate transcripts only (no analysis data)")
+@click.option("--filter", "filter_expression", callback=validate_filter_option, help="Metadata filter applied before transcript fetch, e.g. 'duration>=120 and views>=10000 and not live'")
+@click.option("--order-by", type=click.Choice(ORDER_BY_FIELDS), help="Sort selected videos by this metric (descending) before transcript fetch")
+@click.option("--top", type=click.IntRange(min=1), help="Keep only the first N videos after filtering/sorting")
+@click.option("--short-max-seconds", type=click.IntRange(min=1), default=180, help="Videos up to this length count as 'short' in --filter")
+@click.option("--proxy", "proxies", multiple=True, help="Proxy URL for transcript fetches (repeatable; 'direct' = no proxy). Defaults to TRANSCRIPT_PROXIES")
+@click.option("--proxy-concurrency", type=click.IntRange(min=1), default=2, help="Maximum concurrent transcript fetches per proxy")
+@asr_options
 def channel(channel_name: str, output_dir: str, fmt: str, max_videos: Optional[int], 
-           period: Optional[str], no_csv: bool, transcripts_only: bool) -> None:
+           period: Optional[str], no_csv: bool, transcripts_only: bool, filter_expression: Optional[str],
+           order_by: Optional[str], top: Optional[int], short_max_seconds: int, proxies: tuple,
+           proxy_concurrency: int, asr_fallback: bool, audio_dir: Optional[str],
+           audio_downloader: Optional[str], asr_model: str, asr_workers: Optional[int],
+           asr_batch_size: int, asr_language: Optional[str]) -> None:
     """チャンネルの全動画を文字起こし＋分析データ生成"""
     try:
         include_csv = not no_csv and not transcripts_only
-        fetch_channel_transcripts(channel_name, output_dir, max_videos, fmt, include_csv, period)
+        configure_egress_pool(proxies, proxy_concurrency)
+        configure_asr_fallback(asr_fallback, audio_dir, audio_downloader, asr_model, asr_workers,
+                               asr_batch_size, asr_language)
+        fetch_channel_transcripts(channel_name, output_dir, max_videos, fmt, include_csv, period,
+                                  filter_expression, order_by, top, short_max_seconds)
+    except Exception as e:
+        raise click.ClickException(str(e))
+    finally:
+        report_egress_stats()
+
+
+@cli.command()
+@click.argument("channel_name")
+@click.option("--queue", "queue_path", required=True, help="Path to the shared SQLite work queue")
+@click.option("--output-dir", default="output/channel_analysis", help="Output directory for channel analysis (must be shared with workers)")
+@click.option("--format", "fmt", type=click.Choice(["md", "txt"]), default="md", help="Output format for transcripts")
+@click.option("--max-videos", type=int, help="Maximum number of videos to process")
+@click.option("--period", type=click.Choice(["3months", "6months", "1year", "all"]), help="Time period to fetch videos from")
+@click.option("--no-csv", is_flag=True, help="Skip CSV/Excel generation")
+@click.option("--transcripts-only", is_flag=True, help="Generate transcripts only (no analysis data)")
+@click.option("--filter", "filter_expression", callback=validate_filter_option, help="Metadata filter applied before transcript fetch, e.g. 'duration>=120 and views>=10000 and not live'")
+@click.option("--order-by", type=click.Choice(ORDER_BY_FIELDS), help="Sort selected videos by this metric (descending) before transcript fetch")
+@click.option("--top", type=click.IntRange(min=1), help="Keep only the first N videos after filtering/sorting")
+@click.option("--short-max-seconds", type=click.IntRange(min=1), default=180, help="Videos up to this length count as 'short' in --filter")
+@click.option("--no-wait", is_flag=True, help="Only enqueue videos; do not wait for workers or assemble results")
+@click.option("--poll-interval", type=float, default=5.0, help="Seconds between progress checks")
+def coordinator(channel_name: str, queue_path: str, output_dir: str, fmt: str, max_videos: Optional[int],
+                period: Optional[str], no_csv: bool, transcripts_only: bool, filter_expression: Optional[str],
+                order_by: Optional[str], top: Optional[int], short_max_seconds: int, no_wait: bool,
+                poll_interval: float) -> None:
+    """分散処理: 動画リストをワークキューに投入し、完了後に結果を集約"""
+    try:
+        queue = open_work_queue(queue_path)
+        include_csv = not no_csv and not transcripts_only
+        meta = enqueue_channel_sweep(queue, channel_name, output_dir, max_videos, fmt, include_csv, period,
+                                     filter_expression, order_by, top, short_max_seconds)
+        if not meta or no_wait:
+            return
+        wait_for_sweep(queue, poll_interval)
+        assemble_sweep_results(queue, meta)
+    except click.ClickException:
+        raise
+    except Exception as e:
+        raise click.ClickException(str(e))
+
+
+@cli.command()
+@click.option("--queue", "queue_path", required=True, help="Path to the shared SQLite work queue")
+@click.option("--worker-id", default=None, help="Worker identifier (default: hostname-pid-random)")
+@click.option("--lease-seconds", type=float, default=120.0, help="Lease duration per video; renewed by heartbeat")
+@click.option("--max-attempts", type=int, default=3, help="Give up on a video after this many expired leases")
+@click.option("--poll-interval", type=float, default=5.0, help="Seconds to wait when no video can be claimed")
+@click.option("--proxy", "proxies", multiple=True, help="Proxy URL for transcript fetches (repeatable; 'direct' = no proxy). Defaults to TRANSCRIPT_PROXIES")
+@click.option("--proxy-concurrency", type=click.IntRange(min=1), default=2, help="Maximum concurrent transcript fetches per proxy")
+@asr_options
+def worker(queue_path: str, worker_id: Optional[str], lease_seconds: float, max_attempts: int,
+           poll_interval: float, proxies: tuple, proxy_concurrency: int, asr_fallback: bool,
+           audio_dir: Optional[str], audio_downloader: Optional[str], asr_model: str,
+           asr_workers: Optional[int], asr_batch_size: int, asr_language: Optional[str]) -> None:
+    """分散処理: ワークキューから動画を取得して文字起こし"""
+    if worker_id is None:
+        worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    try:
+        configure_egress_pool(proxies, proxy_concurrency)
+        configure_asr_fallback(asr_fallback, audio_dir, audio_downloader, asr_model, asr_workers,
+                               asr_batch_size, asr_language)
+        queue = open_work_queue(queue_path)
+        run_sweep_worker(queue, worker_id, lease_seconds, max_attempts, poll_interval)
+    except Exception as e:
+        raise click.ClickException(str(e))
+    finally:
+        report_egress_stats()
+
+
+@cli.command("asr-bench")
+@click.argument("audio_path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--asr-model", default="small", help="ASR model name or path")
+@click.option("--workers", "worker_counts", type=int, multiple=True, help="Worker counts to compare (repeatable, default: 1 and CPU count / 4)")
+@click.option("--batch-size", type=click.IntRange(min=1), default=8, help="Audio chunks decoded per batched inference call")
+@click.option("--language", default=None, help="Spoken language (default: auto-detect)")
+def asr_bench(audio_path: str, asr_model: str, worker_counts: tuple, batch_size: int, language: Optional[str]) -> None:
+    """ローカル音声ファイルでASRフォールバックの処理速度を計測"""
+    try:
+        audio = load_audio(Path(audio_path))
+        audio_seconds = len(audio) / ASR_SAMPLE_RATE
+        chunks = split_on_silence(audio)
+        click.echo(f"🎧 Audio: {format_duration(int(audio_seconds))} ({len(chunks)} chunks)")
+        
+        for workers in worker_counts or sorted({1, default_asr_workers()}):
+            with create_asr_executor(asr_model, workers) as executor:
+                # モデル読み込みを計測から除外するため、全ワーカーの初期化完了を待つ
+                warm_up_asr_executor(executor, workers)
+                started = time.time()
+                segments = transcribe_audio(audio, executor, batch_size, language)
+                elapsed = time.time() - started
+            click.echo(
+                f"⏱️  workers={workers}: {elapsed:.1f}s, {len(segments)} segments, "
+                f"realtime factor {audio_seconds / elapsed:.1f}x"
+            )
+    except Exception as e:
+        raise click.ClickException(str(e))
+
+
+@cli.command()
+@click.argument("run_dirs", nargs=-1, required=True, type=click.Path(exists=True, file_okay=False))
+@click.option("--output", default="output/corpus.arrow", help="Arrow IPC (Feather v2) file to create or update")
+@click.option("--rebuild", is_flag=True, help="Ignore the existing file and rebuild the corpus from scratch")
+def export(run_dirs: tuple, output: str, rebuild: bool) -> None:
+    """実行ディレクトリの文字起こし・分析データをArrowファイルに書き出し"""
+    try:
+        export_corpus(list(run_dirs), output, rebuild)
+    except click.ClickException:
+        raise
     except Exception as e:
         raise click.ClickException(str(e))
 
@@ -748,7 +2231,11 @@ def main(url: str, output_path: str, fmt: str) -> None:
     if not video_id:
         raise click.ClickException("Invalid YouTube URL or ID")
 
-    text = fetch_transcript(video_id)
+    configure_egress_pool()
+    try:
+        text = fetch_transcript(video_id)
+    finally:
+        report_egress_stats()
     ensure_parent_dir(output_path)
     body = format_output(text, url, fmt)
     with open(output_path, "w", encoding="utf-8") as f:
@@ -758,7 +2245,7 @@ def main(url: str, output_path: str, fmt: str) -> None:
 
 if __name__ == "__main__":
     import sys
-    if len(sys.argv) > 1 and sys.argv[1] in ['video', 'channel']:
+    if len(sys.argv) > 1 and sys.argv[1] in ['video', 'channel', 'coordinator', 'worker', 'asr-bench', 'export']:
         cli()
     else:
         main()